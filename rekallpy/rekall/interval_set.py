@@ -20,6 +20,11 @@ class IntervalSet:
     Note:
         This class does not obey the uniqueness semantics of a Set.
 
+        IntervalSets are treated as immutable. Operations that would leave the
+        set unchanged (e.g. ``dilate(0)``, ``minus`` against an empty set,
+        ``coalesce`` when no intervals touch) return ``self`` instead of a
+        copy, so the same IntervalSet may be shared by several results.
+
         When the number of intervals is larger than NUM_INTRVLS_THRESHOLD,
         binary operations `join`, `collect_by_interval` and `filter_against`
         will no longer operate on the full cross product of the intervals, and
@@ -45,10 +50,11 @@ class IntervalSet:
         Args:
             intrvls: a list of Intervals to put in the set.
         """
-        self._intrvls = sorted(list(intrvls))
+        self._intrvls = sorted(intrvls)
         self._primary_axis = None
         if len(self._intrvls) > 0:
             self._primary_axis = self._intrvls[0]['bounds'].primary_axis()
+        self._starts, self._ends = self._get_primary_axis_columns()
         self._optimization_window = self._get_optimization_window()
 
     def __repr__(self):
@@ -59,12 +65,22 @@ class IntervalSet:
         """Get length."""
         return len(self._intrvls)
 
+    # Store the primary axis co-ordinates of the intervals as two parallel
+    # lists, so scans along the primary axis read plain lists instead of
+    # going through Interval and Bounds lookups for every interval.
+    def _get_primary_axis_columns(self):
+        if self._primary_axis is None:
+            return [], []
+        start, end = self._primary_axis
+        bounds = [i.bounds for i in self._intrvls]
+        return [b[start] for b in bounds], [b[end] for b in bounds]
+
     # Compute the default optimization_window based on the current intervals
     def _get_optimization_window(self):
         n = len(self._intrvls)
         if n > 0:
-            max_end = max([i[self._primary_axis[1]] for i in self._intrvls])
-            min_start = min([i[self._primary_axis[0]] for i in self._intrvls])
+            max_end = max(self._ends)
+            min_start = min(self._starts)
             if n > IntervalSet.NUM_INTRVLS_THRESHOLD:
                 return (max_end - min_start) * IntervalSet.DEFAULT_FRACTION
             else:
@@ -220,40 +236,47 @@ class IntervalSet:
         Returns:
             A flattened list of mapper outputs.
         """
+        # Pairs are cut off ahead of an interval in self only where a window
+        # applies: an explicit one, or the default for sets larger than
+        # NUM_INTRVLS_THRESHOLD. Smaller sets look at every later interval.
         if window is None:
             window = self._optimization_window
-
-        self_pa = self._primary_axis
-        other_pa = other._primary_axis
-
-        # State is (other_start_index, outputs, done_flag)
-        def update_state(state, intrvlself):
-            start_index, outputs, done = state
+            if len(self._intrvls) > IntervalSet.NUM_INTRVLS_THRESHOLD:
+                window_ahead = window
+            else:
+                window_ahead = float('inf')
+        else:
+            window_ahead = window
+
+        other_intrvls = other.get_intervals()
+        other_starts = other._starts
+        other_ends = other._ends
+        num_other = len(other_intrvls)
+
+        start_index = 0
+        done = False
+        outputs = []
+        for intrvlself, self_start, self_end in zip(
+                self._intrvls, self._starts, self._ends):
             intervals_in_other = []
             if not done:
                 new_start_index = None
-                for idx, intrvlother in enumerate(
-                        other.get_intervals()[start_index:]):
-                    self_start = intrvlself[self_pa[0]]
-                    self_end = intrvlself[self_pa[1]]
-                    other_start = intrvlother[other_pa[0]]
-                    other_end = intrvlother[other_pa[1]]
+                for idx in range(start_index, num_other):
+                    other_end = other_ends[idx]
                     if self_start - window <= other_end:
                         if new_start_index is None:
-                            new_start_index = idx + start_index
-                        if other_start - window > other_end:
+                            new_start_index = idx
+                        # other is sorted by start, so no later interval
+                        # can be within window of this one either
+                        if other_starts[idx] - window_ahead > self_end:
                             break
-                        intervals_in_other.append(intrvlother)
+                        intervals_in_other.append(other_intrvls[idx])
                 if new_start_index is None:
                     done = True
                 else:
                     start_index = new_start_index
-            outputs.append(mapper(intrvlself, intervals_in_other))
-            return start_index, outputs, done
-
-        state = (0, [], False)
-        _, outputs, _ = self.fold(update_state, state)
-        return [r for results in outputs for r in results]
+            outputs.extend(mapper(intrvlself, intervals_in_other))
+        return outputs
 
     def join(self, other, predicate, merge_op, window=None):
         """Cross-products two sets and combines pairs that pass the predicate.
@@ -393,6 +416,8 @@ class IntervalSet:
             the intervals will overlap with the intervals in ``other`` along
             ``axis``.
         """
+        if other.empty():
+            return self
         if axis is None:
             axis = self._primary_axis
 
@@ -648,6 +673,8 @@ class IntervalSet:
         Returns:
             A new IntervalSet with the dilated intervals.
         """
+        if window == 0:
+            return self
         if axis is None:
             axis = self._primary_axis
 
@@ -678,8 +705,19 @@ class IntervalSet:
         """
         if axis is None:
             axis = self._primary_axis
-        return self.filter(lambda intrvl: intrvl.size(axis) >= min_size and (
-            max_size == INFTY or intrvl.size(axis) <= max_size))
+        if axis != self._primary_axis:
+            return self.filter(lambda intrvl: intrvl.size(axis) >= min_size
+                and (max_size == INFTY or intrvl.size(axis) <= max_size))
+        kept = [
+            intrvl
+            for intrvl, start, end in zip(self._intrvls, self._starts,
+                                          self._ends)
+            if end - start >= min_size and (
+                max_size == INFTY or end - start <= max_size)
+        ]
+        if len(kept) == len(self._intrvls):
+            return self
+        return IntervalSet([intrvl.copy() for intrvl in kept])
 
     def group_by_axis(self, axis, output_bounds):
         """Group intervals by a particular axis.
@@ -839,6 +877,17 @@ class IntervalSet:
         sorted_intervals = self._intrvls.copy()
         sorted_intervals = sorted(sorted_intervals, key=lambda intrvl: (intrvl[axis[0]], intrvl[axis[1]]))
 
+        # If every interval starts more than epsilon after all the ones
+        # before it have ended, nothing gets merged
+        reach = None
+        for intrvl in sorted_intervals:
+            start, end = intrvl[axis[0]], intrvl[axis[1]]
+            if reach is not None and start <= reach + epsilon:
+                break
+            reach = max(start, end) if reach is None else max(reach, start, end)
+        else:
+            return self
+
         for intrvl in sorted_intervals:
             new_current_intrvls = []
             for cur in current_intrvls:
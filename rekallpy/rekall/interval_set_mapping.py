@@ -17,9 +17,13 @@ Intervals into one IntervalSet, or use the TV channel name as the domain key
 to re-group for downstream processing. IntervalSetMapping provides a convenient
 mechanism for dynamic re-grouping.
 """
+from collections import defaultdict
 from collections.abc import MutableMapping
+from concurrent.futures import ProcessPoolExecutor
 from operator import attrgetter
 from types import MethodType
+import os
+import cloudpickle
 from tqdm import tqdm
 
 from rekall.interval import Interval
@@ -29,6 +33,38 @@ from rekall.helpers import perf_count
 def _empty_set():
     return IntervalSet([])
 
+# The IntervalSet method call is serialized with cloudpickle once per pool and
+# installed as a global in each worker, so predicates and merge ops may be
+# lambdas or closures. The IntervalSets themselves go through regular pickle.
+def _child_process_init(serialized_call):
+    global _METHOD_CALL
+    _METHOD_CALL = cloudpickle.loads(serialized_call)
+
+def _apply_method_call(sets):
+    name, args, kwargs = _METHOD_CALL
+    return getattr(IntervalSet, name)(*sets, *args, **kwargs)
+
+def _apply_method(name, set_tuples, args, kwargs, progress_bar, parallel):
+    """Calls IntervalSet method ``name`` on each tuple of IntervalSets.
+
+    Returns an iterable of results in the same order as ``set_tuples``. If
+    ``parallel`` is True, the calls are distributed over a process pool with
+    one worker per core.
+    """
+    if not parallel or len(set_tuples) < 2:
+        if progress_bar:
+            set_tuples = tqdm(set_tuples)
+        return (getattr(IntervalSet, name)(*sets, *args, **kwargs)
+                for sets in set_tuples)
+    serialized_call = cloudpickle.dumps((name, args, kwargs))
+    with ProcessPoolExecutor(max_workers=os.cpu_count(),
+            initializer=_child_process_init,
+            initargs=(serialized_call,)) as executor:
+        results = executor.map(_apply_method_call, set_tuples)
+        if progress_bar:
+            results = tqdm(results, total=len(set_tuples))
+        return list(results)
+
 class IntervalSetMapping(MutableMapping):
     """A wrapper around a dictionary from key to IntervalSet.
 
@@ -47,6 +83,15 @@ class IntervalSetMapping(MutableMapping):
     returns a dictionary from the key to the result of the method call on the
     underlying IntervalSet.
 
+    All reflected methods accept the keyword arguments ``profile`` (print the
+    wall time of the call) and ``progress_bar`` (display a tqdm progress bar
+    over the keys). The in-system methods also accept ``parallel``: if True,
+    the per-key IntervalSet operations run on a process pool with one worker
+    per core. Since the domains are independent this scales with the number
+    of keys, but every argument to the method (predicates, merge ops, etc.)
+    must be serializable by cloudpickle, and the IntervalSets and their
+    payloads by pickle.
+
     IntervalSetMapping exposes Python's getter/setter paradigm as well, so
     individual IntervalSet's can be referenced using bracket notation and their
     key.
@@ -196,16 +241,12 @@ class IntervalSetMapping(MutableMapping):
         Note:
             Everything in iterable will be materialized in RAM.
         """
-        key_to_intervals = {}
+        key_to_intervals = defaultdict(list)
         for row in (tqdm(iterable, total=total)
                 if progress and total is not None else tqdm(iterable)
                 if progress else iterable):
-            interval = Interval(bounds_parser(row), payload_parser(row))
-            key = key_parser(row)
-            if key in key_to_intervals:
-                key_to_intervals[key].append(interval)
-            else:
-                key_to_intervals[key] = [interval]
+            key_to_intervals[key_parser(row)].append(
+                    Interval(bounds_parser(row), payload_parser(row)))
         return cls({key: IntervalSet(intervals) for key, intervals in 
             key_to_intervals.items()})
 
@@ -263,66 +304,72 @@ class IntervalSetMapping(MutableMapping):
             k: intervalset.map_payload(lambda p:(p,k))
             for k, intervalset in self.get_grouped_intervals().items()})
 
-    @staticmethod
-    def _remove_empty_intervalsets(grouped_intervals):
-        new_map = {}
-        for key, intervalset in grouped_intervals.items():
-            if not intervalset.empty():
-                new_map[key] = intervalset
-        return new_map
-
     @staticmethod
     def _get_wrapped_unary_method(name):
-        def method(self, *args, profile=False, progress_bar=False, **kwargs):
+        def method(self, *args, profile=False, progress_bar=False,
+                parallel=False, **kwargs):
             with perf_count(name, profile):
                 selfmap = self.get_grouped_intervals()
-                keys_to_process = selfmap.keys()
-                if progress_bar:
-                    keys_to_process = tqdm(keys_to_process)
-
-                def func(set1):
-                    return getattr(IntervalSet, name)(set1,*args,**kwargs)
-
-                results_map = {v:func(selfmap[v]) for v in keys_to_process}
-            return IntervalSetMapping(
-                    IntervalSetMapping._remove_empty_intervalsets(
-                        results_map))
+                results = _apply_method(name,
+                        [(set1,) for set1 in selfmap.values()],
+                        args, kwargs, progress_bar, parallel)
+
+                # Drop empty results in the same pass that collects them
+                results_map = {k:result for k, result in
+                        zip(selfmap.keys(), results)
+                        if not result.empty()}
+            return IntervalSetMapping(results_map)
         return method
 
     @staticmethod
     def _get_wrapped_binary_method(name):
-        def method(self, other, *args, profile=False, progress_bar=False, **kwargs):
+        def method(self, other, *args, profile=False, progress_bar=False,
+                parallel=False, **kwargs):
             with perf_count(name, profile):
                 selfmap = self.get_grouped_intervals()
                 othermap = other.get_grouped_intervals()
-                keys = set(selfmap.keys()).union(othermap.keys())
-                if progress_bar:
-                    keys = tqdm(keys)
-
-                def func(set1, set2):
-                    return getattr(IntervalSet, name)(
-                            set1,set2,*args,**kwargs)
-
-                results_map = {v:
-                        func(
-                            selfmap.get(v, IntervalSet([])),
-                            othermap.get(v, IntervalSet([]))) for v in keys}
-            return IntervalSetMapping(
-                    IntervalSetMapping._remove_empty_intervalsets(
-                        results_map))
+                # Outer join on keys with O(1) dict lookups. The union of a
+                # set with nothing is the set itself, so union keeps one-sided
+                # sets as is. Every other binary method returns an empty set
+                # when self has no intervals, so keys only in other are
+                # skipped.
+                is_union = name == "union"
+                results_map = {}
+                keys = []
+                pairs = []
+                for k, set1 in selfmap.items():
+                    set2 = othermap.get(k)
+                    if set2 is None and is_union:
+                        if not set1.empty():
+                            results_map[k] = set1
+                    else:
+                        keys.append(k)
+                        pairs.append((set1,
+                            set2 if set2 is not None else _empty_set()))
+                if is_union:
+                    for k, set2 in othermap.items():
+                        if k not in selfmap and not set2.empty():
+                            results_map[k] = set2
+                results = _apply_method(name, pairs, args, kwargs,
+                        progress_bar, parallel)
+
+                # Drop empty results in the same pass that collects them
+                results_map.update((k, result)
+                        for k, result in zip(keys, results)
+                        if not result.empty())
+            return IntervalSetMapping(results_map)
         return method
 
     @staticmethod
     def _get_wrapped_out_of_system_unary_method(name):
         def method(self, *args, profile=False, progress_bar=False, **kwargs):
             with perf_count(name, profile):
-                selfmap = self.get_grouped_intervals()
-                keys = selfmap.keys()
+                items = self.get_grouped_intervals().items()
                 if progress_bar:
-                    keys = tqdm(keys)
+                    items = tqdm(items)
 
                 def func(set1):
                     return getattr(IntervalSet, name)(set1,*args,**kwargs)
-            return {v:func(selfmap[v]) for v in keys}
+            return {k:func(set1) for k, set1 in items}
         return method
 
@@ -2,7 +2,10 @@
 ``IntervalSetMapping``'s. Provides some common data loading facilities from
 data sources that we've seen appear regularly in our use."""
 
-from operator import attrgetter
+from functools import lru_cache
+from operator import attrgetter, itemgetter
+from rekall.interval import Interval
+from rekall.interval_set import IntervalSet
 from rekall.interval_set_mapping import IntervalSetMapping
 from rekall.bounds import Bounds1D, Bounds3D
 from tqdm import tqdm
@@ -12,10 +15,28 @@ def getter_accessor(row, field):
     like Pandas/Spark dataframes. Returns ``row[field]``."""
     return row[field]
 
+# Schemas only have a handful of fields, so build each attrgetter once
+_cached_attrgetter = lru_cache(maxsize=None)(attrgetter)
+
 def attrgetter_accessor(row, field):
     """Accessor for iterables whose fields are put into class attributes,
-    like Django querysets. Returns the equivalent of ``row.field``."""
-    return attrgetter(field)(row)
+    like Django querysets. Returns the equivalent of ``row.field``.
+
+    Dotted field names like ``face.frame.number`` access nested attributes."""
+    return _cached_attrgetter(field)(row)
+
+def _compile_accessor(key_accessor, field):
+    """Returns a function that takes a row and returns
+    ``key_accessor(row, field)``.
+
+    For ``getter_accessor`` and ``attrgetter_accessor`` this is an
+    ``itemgetter`` or ``attrgetter``, so reading a field costs no Python call
+    and no schema lookup per row."""
+    if key_accessor is getter_accessor:
+        return itemgetter(field)
+    if key_accessor is attrgetter_accessor:
+        return attrgetter(field)
+    return lambda row: key_accessor(row, field)
 
 def ism_from_iterable_with_schema_bounds1D(iterable, key_accessor,
         bounds_schema={}, with_payload=lambda x: None, progress=False,
@@ -78,12 +99,11 @@ def ism_from_iterable_with_schema_bounds1D(iterable, key_accessor,
         "t2": "t2"
     }
     schema_final.update(bounds_schema)
-    def key_parser(item):
-        return key_accessor(item, schema_final['key'])
+    key_parser = _compile_accessor(key_accessor, schema_final['key'])
+    get_t1 = _compile_accessor(key_accessor, schema_final['t1'])
+    get_t2 = _compile_accessor(key_accessor, schema_final['t2'])
     def bounds_parser(item):
-        return Bounds1D(
-            key_accessor(item, schema_final['t1']),
-            key_accessor(item, schema_final['t2']))
+        return Bounds1D(get_t1(item), get_t2(item))
     return IntervalSetMapping.from_iterable(iterable, key_parser,
         bounds_parser, with_payload, progress, total)
     
@@ -158,18 +178,16 @@ def ism_from_iterable_with_schema_bounds3D(iterable, key_accessor,
         "t2": "t2"
     }
     schema_final.update(bounds_schema)
-    def key_parser(item):
-        return key_accessor(item, schema_final['key'])
+    key_parser = _compile_accessor(key_accessor, schema_final['key'])
+    get_t1 = _compile_accessor(key_accessor, schema_final['t1'])
+    get_t2 = _compile_accessor(key_accessor, schema_final['t2'])
+    optional_getters = [
+        (k, _compile_accessor(key_accessor, schema_final[k]))
+        for k in ['x1', 'x2', 'y1', 'y2'] if k in schema_final
+    ]
     def bounds_parser(item):
-        args = [
-            key_accessor(item, schema_final['t1']),
-            key_accessor(item, schema_final['t2'])
-        ]
-        kwargs = {}
-        for k in ['x1', 'x2', 'y1', 'y2']:
-            if k in schema_final:
-                kwargs[k] = key_accessor(item, schema_final[k])
-        return Bounds3D(*args, **kwargs)
+        kwargs = {k: getter(item) for k, getter in optional_getters}
+        return Bounds3D(get_t1(item), get_t2(item), **kwargs)
     return IntervalSetMapping.from_iterable(iterable, key_parser,
         bounds_parser, with_payload, progress, total)
 
@@ -224,12 +242,6 @@ def ism_from_django_qs(qs, bounds_class=Bounds3D, bounds_schema={}, with_payload
         NotImplementedError: If ``bounds_class`` is not one of ``Bounds3D`` or
             ``Bounds1D``.
     """
-    def django_accessor(row, field):
-        fields = field.split('.')
-        output = row
-        for field in fields:
-            output = attrgetter_accessor(output, field)
-        return output
     final_schema = {
         "key": "video_id",
         "t1": "min_frame",
@@ -239,29 +251,93 @@ def ism_from_django_qs(qs, bounds_class=Bounds3D, bounds_schema={}, with_payload
     total = None
     if progress is not None:
         total = qs.count()
-    def payload_parser(record):
-        if not with_payload is None:
-            return with_payload(record)
-        else:
-            if "payload" in final_schema:
-                return django_accessor(record, final_schema["payload"])
-            else:
-                return None
+    if with_payload is not None:
+        payload_parser = with_payload
+    elif "payload" in final_schema:
+        payload_parser = attrgetter(final_schema["payload"])
+    else:
+        payload_parser = lambda record: None
     if bounds_class == Bounds3D:
-        return ism_from_iterable_with_schema_bounds3D(qs, django_accessor,
+        return ism_from_iterable_with_schema_bounds3D(qs, attrgetter_accessor,
             bounds_schema=final_schema, with_payload=payload_parser,
             progress=progress, total=total)
     elif bounds_class == Bounds1D:
-        return ism_from_iterable_with_schema_bounds1D(qs, django_accessor,
+        return ism_from_iterable_with_schema_bounds1D(qs, attrgetter_accessor,
             bounds_schema=final_schema, with_payload=payload_parser,
             progress=progress, total=total)
     else:
         raise NotImplementedError("{} not a supported bounds".format(
             bounds_class.__name__))
 
+def _bounds_fields(bounds_class, schema):
+    """Returns the co-ordinates of ``bounds_class`` that are set by
+    ``schema``."""
+    if bounds_class == Bounds3D:
+        return ['t1', 't2'] + [k for k in ['x1', 'x2', 'y1', 'y2']
+                if k in schema]
+    elif bounds_class == Bounds1D:
+        return ['t1', 't2']
+    else:
+        raise NotImplementedError("{} not a supported bounds".format(
+            bounds_class.__name__))
+
+def _spark_df_to_pandas(df, fields):
+    """Collects the columns in ``fields`` of a Spark dataframe into a Pandas
+    dataframe, using Arrow for the columnar transfer. The session's Arrow
+    setting is restored afterwards."""
+    conf = df.sparkSession.conf
+    arrow_key = "spark.sql.execution.arrow.pyspark.enabled"
+    old_value = conf.get(arrow_key, None)
+    conf.set(arrow_key, "true")
+    try:
+        return df.select(*dict.fromkeys(fields)).toPandas()
+    finally:
+        if old_value is None:
+            conf.unset(arrow_key)
+        else:
+            conf.set(arrow_key, old_value)
+
+def _ism_from_pandas_df(df, bounds_class, schema, progress=False):
+    """Constructs an IntervalSetMapping from the columns of a Pandas dataframe.
+
+    Rows are grouped by key with a stable sort over the factorized key codes,
+    so the per-row work left in Python is only constructing the Intervals.
+    Null keys form a group of their own, as they do when ingesting rows.
+    """
+    import numpy as np
+
+    coords = _bounds_fields(bounds_class, schema)
+    codes, uniques = df[schema['key']].factorize(use_na_sentinel=False)
+    order = np.argsort(codes, kind='stable')
+    group_sizes = np.bincount(codes, minlength=len(uniques))
+    group_ends = np.cumsum(group_sizes)
+    # Read each key from the first row of its group the same way rows are
+    # read, so null keys come out as in to_dict('records') (e.g. None, not <NA>)
+    group_firsts = order[group_ends - group_sizes]
+    unique_keys = df[[schema['key']]].iloc[group_firsts].to_dict(
+            'list')[schema['key']]
+
+    def split_column(field):
+        return np.split(df[field].to_numpy()[order], group_ends[:-1])
+
+    coord_groups = [split_column(schema[k]) for k in coords]
+    payload_groups = (split_column(schema['payload'])
+            if 'payload' in schema else None)
+
+    output = {}
+    indices = range(len(unique_keys))
+    for i in (tqdm(indices) if progress else indices):
+        values = zip(*[group[i].tolist() for group in coord_groups])
+        bounds = [bounds_class(**dict(zip(coords, v))) for v in values]
+        payloads = (payload_groups[i].tolist() if payload_groups is not None
+                else [None] * len(bounds))
+        output[unique_keys[i]] = IntervalSet([
+            Interval(b, p) for b, p in zip(bounds, payloads)])
+    return IntervalSetMapping(output)
+
 # from Pandas DF
 def ism_from_df(df, bounds_class=Bounds3D, bounds_schema={}, progress=None,
-        total=None):
+        total=None, stream=False):
     """Default constructor for Pandas-style dataframes.
 
     This uses the right accessor for rows in a dataframe and by default creates
@@ -286,8 +362,19 @@ def ism_from_df(df, bounds_class=Bounds3D, bounds_schema={}, progress=None,
 
     This will set the payload of each Interval to the id field of the row.
 
+    Pandas and Spark dataframes are read column-wise: Spark dataframes are
+    first converted to Pandas through Arrow, and rows are grouped by key with
+    NumPy. Any other iterable of rows (e.g. the output of ``collect()`` on a
+    Spark dataframe) is read row by row with ``getter_accessor``.
+
+    Converting a Spark dataframe to Pandas holds the whole dataframe in memory
+    on the driver. With ``stream=True``, rows are instead pulled one partition
+    at a time with ``toLocalIterator()``, so only one partition and the
+    resulting Intervals are held in memory.
+
     Args:
-        qs: A Django queryset where every record will become an Interval. 
+        df: A dataframe or an iterable of rows where every row will become
+            an Interval.
         bounds_class (optional): The bounds that each Interval will have.
             Curently only supports Bounds1D and Bounds3D. Defaults to Bounds3D.
         bounds_schema (optional): A dictionary that overrides the default field
@@ -300,6 +387,8 @@ def ism_from_df(df, bounds_class=Bounds3D, bounds_schema={}, progress=None,
         total (optional): Used in conjunction with ``progress`` to optionally
             display the total number of items in the loading bar if
             ``progress`` is ``True``.
+        stream (optional): Whether to stream the rows of a Spark dataframe
+            instead of converting it to Pandas. Defaults to ``False``.
 
     Returns:
         An IntervalSetMapping with Intervals from each record of qs.
@@ -314,11 +403,27 @@ def ism_from_df(df, bounds_class=Bounds3D, bounds_schema={}, progress=None,
         "t2": "max_frame"
     }
     final_schema.update(bounds_schema)
-    def payload_parser(record):
+    if hasattr(df, 'toPandas'):
+        fields = [final_schema[k] for k in
+                ['key'] + _bounds_fields(bounds_class, final_schema)]
         if "payload" in final_schema:
-            return getter_accessor(record, final_schema["payload"])
+            fields.append(final_schema["payload"])
+        if stream:
+            # Spark Rows are tuples, so read fields by their position in the
+            # selection with itemgetter instead of looking them up by name
+            fields = list(dict.fromkeys(fields))
+            positions = {field: i for i, field in enumerate(fields)}
+            final_schema = {k: positions[v] for k, v in final_schema.items()
+                    if v in positions}
+            df = df.select(*fields).toLocalIterator()
         else:
-            return None
+            df = _spark_df_to_pandas(df, fields)
+    if hasattr(df, 'to_numpy'):
+        return _ism_from_pandas_df(df, bounds_class, final_schema, progress)
+    if "payload" in final_schema:
+        payload_parser = itemgetter(final_schema["payload"])
+    else:
+        payload_parser = lambda record: None
     if bounds_class == Bounds3D:
         return ism_from_iterable_with_schema_bounds3D(df, getter_accessor,
             bounds_schema=final_schema, with_payload=payload_parser,
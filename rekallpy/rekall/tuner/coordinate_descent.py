@@ -2,15 +2,25 @@
 
 from rekall.tuner import Tuner
 from rekall.tuner.random import RandomTuner
+from collections import deque
+import math
 import random
+import numpy as np
 
 class CoordinateDescentTuner(Tuner):
     """This tuner performs coordinate descent over the search space."""
     
-    def line_search(self, config, cur_param, epsilon, budget, cur_score = 0):
+    def _to_config(self, values):
+        """Builds a config dict from a list with the value of each co-ordinate,
+        in sorted co-ordinate order."""
+        return dict(zip(self._coordinates, values))
+
+    def line_search(self, values, index, epsilon, budget, cur_score = 0):
         '''
-        Vary cur_param within the bounds of the search_space (holding the other
-        parameters constant), maximizing the accuracy function.
+        Vary the co-ordinate at position index of values within the bounds of
+        the search_space (holding the other parameters constant), maximizing
+        the accuracy function. values holds the value of each co-ordinate in
+        sorted order, and is modified in place.
 
         Let X be the current param, and let F(X) represent the accuracy function.
         Let Y be the range of X in the search_space.
@@ -24,58 +34,113 @@ class CoordinateDescentTuner(Tuner):
             F(X - l * epsilon * Y) < F(X - (l - 1) * epsilon * Y), and return
             X - (l - 1) * epsilon * Y as the new value of the parameter
         '''
-        minval, maxval = self.search_space[cur_param]['range']
+        minval, maxval = self.search_space[self._coordinates[index]]['range']
         Y = maxval - minval
         delta = epsilon * Y
 
-        orig_val = config[cur_param]
-        if orig_val + delta > maxval and orig_val - delta < minval:
+        orig_val = values[index]
+        if delta <= 0:
             return orig_val, cur_score
 
-        # Determine direction
-        cur_val = orig_val + delta
-        config[cur_param] = cur_val
-        
+        # sign * (a - b) > 0 iff a is a better score than b
+        sign = 1 if self.maximize else -1
+
+        # Number of whole steps that stay in bounds in each direction, so the
+        # walk below is a plain counted loop
+        max_steps = {
+            1: int(math.floor((maxval - orig_val) / delta)),
+            -1: int(math.floor((orig_val - minval) / delta))
+        }
+
+        # Tuners that score configs in batches walk the whole line at once
+        if type(self).evaluate_configs is not Tuner.evaluate_configs:
+            return self._batched_line_search(values, index, delta, max_steps,
+                    budget, cur_score, sign)
+
         local_cost = 0
-        score = self.evaluate_config(config)
-        local_cost += 1
-
-        # If the score is worse, try other direction
-        if ((self.maximize and score < cur_score) or
-            (not self.maximize and score > cur_score)):
-            delta = -1 * delta
-            cur_val = orig_val + delta
-            config[cur_param] = cur_val
-            
-            score = self.evaluate_config(config)
-            local_cost += 1
+        for direction in [1, -1]:
+            if max_steps[direction] < 1:
+                continue
+            step = direction * delta
 
-            # Neither direction works
-            if ((self.maximize and score < cur_score) or
-                (not self.maximize and score > cur_score)):
-                return orig_val, cur_score
-
-        # Find the optimal value of l
-        prev_score = score
-        while local_cost < budget and self.cost < self.budget:
-            if cur_val + delta > maxval or cur_val + delta < minval:
-                break
-            cur_val += delta
-            config[cur_param] = cur_val
-            
-            score = self.evaluate_config(config)
+            # Determine direction
+            values[index] = orig_val + step
+            score = self._eval_cached(self._to_config(values))
             local_cost += 1
-            
-            # If this score is worse
-            if ((self.maximize and score < cur_score) or
-                (not self.maximize and score > cur_score)):
-                # Go back one step
-                cur_val -= delta
-                break
+
+            # If the score is worse, try other direction
+            if sign * (score - cur_score) < 0:
+                continue
+
+            # Find the optimal value of l
+            l = 1
             prev_score = score
+            for next_l in range(2, max_steps[direction] + 1):
+                if local_cost >= budget or self.cost >= self.budget:
+                    break
+                values[index] = orig_val + next_l * step
 
-        return cur_val, prev_score
+                score = self._eval_cached(self._to_config(values))
+                local_cost += 1
+
+                # If this score is worse, stay one step back
+                if sign * (score - cur_score) < 0:
+                    break
+                l = next_l
+                prev_score = score
+
+            return orig_val + l * step, prev_score
+
+        # Neither direction works
+        return orig_val, cur_score
     
+    def _batched_line_search(self, values, index, delta, max_steps, budget,
+            cur_score, sign):
+        '''
+        Same search as line_search, for tuners that override evaluate_configs
+        to score many configs at once.
+
+        The first step in both directions is scored in one batch. The
+        remaining steps in the chosen direction (up to the budget) are scored
+        in a second batch, and the search keeps the steps before the first
+        one that is worse than cur_score.
+        '''
+        orig_val = values[index]
+
+        def evaluate(vals):
+            configs = []
+            for val in vals:
+                values[index] = val
+                configs.append(self._to_config(values))
+            return self._eval_cached_batch(configs)
+
+        directions = [d for d in [1, -1] if max_steps[d] >= 1]
+        first_scores = evaluate([orig_val + d * delta for d in directions])
+        local_cost = len(directions)
+
+        for direction, score in zip(directions, first_scores):
+            # If the score is worse, try other direction
+            if sign * (score - cur_score) < 0:
+                continue
+            step = direction * delta
+
+            num_steps = min(max_steps[direction] - 1, budget - local_cost,
+                    self.budget - self.cost)
+            if num_steps < 1:
+                return orig_val + step, score
+            steps = np.arange(2, num_steps + 2)
+            scores = np.array(evaluate((orig_val + steps * step).tolist()))
+
+            # Keep the steps before the first one that is worse
+            worse = np.flatnonzero(sign * (scores - cur_score) < 0)
+            l = int(worse[0]) if len(worse) > 0 else num_steps
+            if l == 0:
+                return orig_val + step, score
+            return orig_val + int(steps[l - 1]) * step, float(scores[l - 1])
+
+        # Neither direction works
+        return orig_val, cur_score
+
     def tune_impl(self, **kwargs):
         '''
         Start with the midpoint of the search space
@@ -99,6 +164,12 @@ class CoordinateDescentTuner(Tuner):
                 Defaults to 10.
             randomize_param_order: Whether to randomize the order of coordinates
                 for coordinate descent. Defaults to False.
+            tol: If the score over the last ``patience`` rounds changes by at
+                most ``tol`` relative to its magnitude, decay alpha without
+                waiting for a round where nothing changes.
+                Defaults to 1e-4. ``None`` disables this early decay.
+            patience: Number of rounds to compare for ``tol``. Defaults to 3.
+                Values below 2 disable the early decay.
         '''
         if 'alpha' not in kwargs or 'decay_rate' not in kwargs:
             print('Coordinate descent requires alpha and decay_rate!')
@@ -122,7 +193,21 @@ class CoordinateDescentTuner(Tuner):
         else:
             randomize_param_order = False
 
+        if 'tol' in kwargs:
+            tol = kwargs['tol']
+        else:
+            tol = 1e-4
+
+        if 'patience' in kwargs:
+            patience = kwargs['patience']
+        else:
+            patience = 3
+
         coordinates = sorted(list(self.search_space.keys()))
+        self._coordinates = coordinates
+
+        # sign * (a - b) > 0 iff a is a better score than b
+        sign = 1 if self.maximize else -1
         
         if self.start_config is not None:
             config = self.start_config
@@ -130,17 +215,24 @@ class CoordinateDescentTuner(Tuner):
             config = {}
 
             # Initialize the config
+            numeric_coordinates = []
             for coordinate in coordinates:
                 param = self.search_space[coordinate]
                 if isinstance(param, dict):
                     if 'range' in param:
-                        minval, maxval = param['range']
-                        config[coordinate] = (maxval + minval) / 2
+                        numeric_coordinates.append(coordinate)
         #             elif 'subset' in param:
         #                 choices = param['subset']
         #                 config[k] = choices[:random.randint(1, len(param['subset']))]
                 elif isinstance(param, list):
-                    config[k] = param[0]
+                    config[coordinate] = param[0]
+            if len(numeric_coordinates) > 0:
+                ranges = np.array([
+                    self.search_space[coordinate]['range']
+                    for coordinate in numeric_coordinates
+                ], dtype=float)
+                config.update(zip(numeric_coordinates,
+                    ranges.mean(axis=1).tolist()))
         elif init_method == 'random':
             config = RandomTuner.generate_configs(self.search_space, 1)[0]
         else:
@@ -152,16 +244,12 @@ class CoordinateDescentTuner(Tuner):
             self.best_score = score
             self.log_msg('Starting score: {}'.format(score))
         else:
-            score = self.evaluate_config(config)
-
-        def config_to_point(config):
-            coords = sorted(coordinates)
-            point = tuple([
-                config[coord]
-                for coord in coords
-            ])
+            score = self._eval_cached(config)
 
-            return point
+        # Work on a list of values indexed by co-ordinate position, and only
+        # build config dicts to evaluate them
+        values = [config[coordinate] for coordinate in coordinates]
+        order = list(range(len(coordinates)))
 
         visited_points = set()
 
@@ -169,57 +257,61 @@ class CoordinateDescentTuner(Tuner):
         rounds = 0
         rounds_since_last_improvement = 0
         last_best_score = cur_score
+        early_decay = tol is not None and patience >= 2
+        round_scores = deque(maxlen=patience if early_decay else 0)
         while self.cost < self.budget:
             self.log_msg('Round {}, current cost {}'.format(rounds, self.cost))
             changed = False
             new_configs = False
 
             if randomize_param_order:
-                random.shuffle(coordinates)
-            for coordinate in coordinates:
+                random.shuffle(order)
+            for index in order:
                 if self.cost > self.budget:
                     break
+                coordinate = coordinates[index]
                 self.log_msg('Coordinate {}, current cost {}'.format(coordinate, self.cost))
-                orig_val = config[coordinate]
+                orig_val = values[index]
                 param = self.search_space[coordinate]
 
                 # Discrete params
                 if isinstance(param, list):
                     max_score = cur_score
                     best_choice = orig_val
-                    for choice in param:
-                        if choice == orig_val:
-                            continue
-                        config[coordinate] = choice
-
-                        score = self.evaluate_config(config)
-                        
-                        if ((self.maximize and score > max_score) or
-                            (not self.maximize and score < max_score)):
+
+                    # Evaluate all the other choices in one batch
+                    config = self._to_config(values)
+                    candidates = [
+                        {**config, coordinate: choice}
+                        for choice in param if choice != orig_val
+                    ][:max(self.budget - self.cost, 0)]
+                    if len(candidates) > 0:
+                        scores = self._eval_cached_batch(candidates)
+                        score, choice = max(
+                            zip(scores, [c[coordinate] for c in candidates]),
+                            key=lambda score_choice: sign * score_choice[0])
+                        if sign * (score - max_score) > 0:
                             best_choice = choice
                             max_score = score
-                        
-                        if self.cost >= self.budget:
-                            break
                     self.log_msg('Old: {}, new: {}'.format(orig_val, best_choice))
                     if best_choice != orig_val:
                         changed = True
-                    config[coordinate] = best_choice
+                    values[index] = best_choice
                     cur_score = max_score
                 # Numerical params
                 elif isinstance(param, dict):
                     if 'range' in param:
                         best_choice, max_score = self.line_search(
-                            config, coordinate, alpha, line_search_budget,
+                            values, index, alpha, line_search_budget,
                             cur_score = cur_score)
 
                         self.log_msg('Old: {}, New: {}'.format(orig_val, best_choice))
                         if best_choice != orig_val:
                             changed = True
-                        config[coordinate] = best_choice
+                        values[index] = best_choice
                         cur_score = max_score
 
-                config_point = config_to_point(config)
+                config_point = tuple(values)
                 if config_point not in visited_points:
                     visited_points.add(config_point)
                     new_configs = True
@@ -228,10 +320,20 @@ class CoordinateDescentTuner(Tuner):
                 rounds_since_last_improvement += 1
             else:
                 rounds_since_last_improvement = 0
+
+            # If the score has plateaued at this alpha, decay it right away
+            if early_decay:
+                round_scores.append(cur_score)
+                if len(round_scores) == patience:
+                    hi, lo = max(round_scores), min(round_scores)
+                    if hi - lo <= tol * max(abs(hi), abs(lo)):
+                        changed = False
+
             if not changed or rounds_since_last_improvement >= 5 or not new_configs:
                 alpha *= decay_rate
                 self.log_msg('New alpha: {}, current cost {}'.format(alpha, self.cost))
                 if alpha < .000001:
                     break
                 rounds_since_last_improvement = 0
+                round_scores.clear()
             rounds += 1
@@ -8,6 +8,7 @@ Reference: https://docs.scipy.org/doc/scipy/reference/optimize.minimize-nelderme
 
 from scipy import optimize
 from rekall.tuner import Tuner
+from rekall.tuner.random import RandomTuner
 
 class ScipyNelderMeadTuner(Tuner):
     
@@ -33,7 +34,7 @@ class ScipyNelderMeadTuner(Tuner):
         
         if self.start_config is not None:
             config = self.start_config
-        elif init_method is 'average':
+        elif init_method == 'average':
             coordinates = list(self.search_space.keys())
             
             config = {}
@@ -49,8 +50,8 @@ class ScipyNelderMeadTuner(Tuner):
         #                 choices = param['subset']
         #                 config[k] = choices[:random.randint(1, len(param['subset']))]
                 elif isinstance(param, list):
-                    config[k] = param[0]
-        elif init_method is 'random':
+                    config[coordinate] = param[0]
+        elif init_method == 'random':
             config = RandomTuner.generate_configs(self.search_space, 1)[0]
         else:
             print('{} is invalid init_method!'.format(init_method))
@@ -88,6 +88,7 @@ class Tuner:
         self.start_score = start_score
         self.score_fn = score_fn
         self.score_log_fn = score_log_fn
+        self._eval_cache = {}
 
         if self.log:
             # Logging subdirectory
@@ -131,6 +132,49 @@ class Tuner:
 
         return score
 
+    def evaluate_configs(self, configs):
+        """Evaluate a list of configs, returning a list of scores.
+
+        Evaluates the configs one at a time by default. Sub-classes whose
+        evaluation function can score many configs at once (e.g. batched model
+        inference or a single Spark job) can override this.
+        """
+        return [self.evaluate_config(config) for config in configs]
+
+    @staticmethod
+    def _cache_key(config):
+        # Round floats so configs that only differ by floating point error
+        # share a key
+        return tuple(sorted(
+            (k, round(v, 10) if isinstance(v, float) else v)
+            for k, v in config.items()))
+
+    def _eval_cached(self, config):
+        """Evaluate the config, reusing the score of an identical config that
+        was already evaluated.
+
+        Float values are rounded to 10 decimal places to build the cache key,
+        so configs that only differ by floating point error hit the cache.
+        Cache hits do not count towards the budget.
+        """
+        key = Tuner._cache_key(config)
+        if key not in self._eval_cache:
+            self._eval_cache[key] = self.evaluate_config(config)
+        return self._eval_cache[key]
+
+    def _eval_cached_batch(self, configs):
+        """Like ``_eval_cached``, but sends all the configs that miss the cache
+        to ``evaluate_configs`` in one call."""
+        keys = [Tuner._cache_key(config) for config in configs]
+        misses = {}
+        for key, config in zip(keys, configs):
+            if key not in self._eval_cache and key not in misses:
+                misses[key] = config
+        if len(misses) > 0:
+            scores = self.evaluate_configs(list(misses.values()))
+            self._eval_cache.update(zip(misses.keys(), scores))
+        return [self._eval_cache[key] for key in keys]
+
     def log_msg(self, msg):
         """Log something to the log file."""
         if self.log:
@@ -0,0 +1,158 @@
+from rekall.bounds import Bounds1D, Bounds3D
+from rekall.stdlib.ingest import ism_from_df
+import unittest
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+class FakeSparkConf:
+    def __init__(self, values):
+        self.values = dict(values)
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+    def set(self, key, value):
+        self.values[key] = value
+
+    def unset(self, key):
+        del self.values[key]
+
+class FakeSparkSession:
+    def __init__(self, conf={}):
+        self.conf = FakeSparkConf(conf)
+
+class FakeSparkDataFrame:
+    """Stands in for a Spark dataframe, backed by a list of dict rows."""
+    def __init__(self, rows, session=None):
+        self.rows = rows
+        self.sparkSession = session or FakeSparkSession()
+        self.selected = None
+        self.arrow_enabled = None
+
+    def select(self, *fields):
+        self.selected = list(fields)
+        return self
+
+    def toLocalIterator(self):
+        # Spark Rows are tuples in selection order
+        for row in self.rows:
+            yield tuple(row[f] for f in self.selected)
+
+    def toPandas(self):
+        self.arrow_enabled = self.sparkSession.conf.get(
+                "spark.sql.execution.arrow.pyspark.enabled")
+        return pd.DataFrame([[row[f] for f in self.selected]
+            for row in self.rows], columns=self.selected)
+
+class TestIngestSparkStream(unittest.TestCase):
+    ROWS = [
+        {'video_id': 2, 'min_frame': 10, 'max_frame': 12, 'bbox_x1': 0.1},
+        {'video_id': 1, 'min_frame': 0, 'max_frame': 2, 'bbox_x1': 0.2},
+        {'video_id': 2, 'min_frame': 5, 'max_frame': 9, 'bbox_x1': 0.3},
+    ]
+
+    @staticmethod
+    def get_tuples(ism, fields):
+        return {key: [tuple(i[f] for f in fields) + (i['payload'],)
+                    for i in ism[key].get_intervals()]
+                for key in ism}
+
+    def test_stream_duplicated_column(self):
+        schema = {'payload': 'min_frame', 'x1': 'bbox_x1'}
+        df = FakeSparkDataFrame(self.ROWS)
+        ism = ism_from_df(df, Bounds3D, schema, stream=True)
+        self.assertEqual(df.selected,
+                ['video_id', 'min_frame', 'max_frame', 'bbox_x1'])
+        self.assertEqual(self.get_tuples(ism, ['t1', 't2', 'x1']),
+                self.get_tuples(ism_from_df(self.ROWS, Bounds3D, schema),
+                    ['t1', 't2', 'x1']))
+        self.assertEqual(self.get_tuples(ism, ['t1', 't2', 'x1']), {
+            1: [(0, 2, 0.2, 0)],
+            2: [(5, 9, 0.3, 5), (10, 12, 0.1, 10)]
+        })
+
+    def test_stream_bounds1D_ignores_x1(self):
+        schema = {'payload': 'max_frame', 'x1': 'bbox_x1'}
+        df = FakeSparkDataFrame(self.ROWS)
+        ism = ism_from_df(df, Bounds1D, schema, stream=True)
+        self.assertEqual(df.selected, ['video_id', 'min_frame', 'max_frame'])
+        self.assertEqual(self.get_tuples(ism, ['t1', 't2']), {
+            1: [(0, 2, 2)],
+            2: [(5, 9, 9), (10, 12, 12)]
+        })
+
+@unittest.skipIf(pd is None, "pandas is not installed")
+class TestIngestPandas(unittest.TestCase):
+    @staticmethod
+    def get_df():
+        return pd.DataFrame({
+            'video_id': [2, 1, 2, 3, 1, 2],
+            'min_frame': [10, 0, 5, 7, 3, 1],
+            'max_frame': [12, 2, 9, 8, 4, 6],
+            'bbox_x1': [0.1, 0.2, 0.3, 0.4, 0.5, 0.6],
+            'id': ['a', 'b', 'c', 'd', 'e', 'f']
+        })
+
+    def assertMappingEq(self, ism1, ism2, fields):
+        # Keys may mix None with other values, so don't iterate in sorted order
+        groups1 = ism1.get_grouped_intervals()
+        groups2 = ism2.get_grouped_intervals()
+        self.assertEqual(set(groups1.keys()), set(groups2.keys()))
+        for key in groups1:
+            list1 = [tuple(i[f] for f in fields) + (i['payload'],)
+                    for i in groups1[key].get_intervals()]
+            list2 = [tuple(i[f] for f in fields) + (i['payload'],)
+                    for i in groups2[key].get_intervals()]
+            self.assertListEqual(list1, list2)
+
+    def assertMatchesRows(self, df, bounds_class, bounds_schema, fields):
+        rows = df.to_dict('records')
+        self.assertMappingEq(
+                ism_from_df(df, bounds_class, bounds_schema),
+                ism_from_df(rows, bounds_class, bounds_schema),
+                fields)
+
+    def test_bounds1D(self):
+        self.assertMatchesRows(self.get_df(), Bounds1D, {}, ['t1', 't2'])
+
+    def test_bounds3D(self):
+        self.assertMatchesRows(self.get_df(), Bounds3D, {},
+                ['t1', 't2', 'x1', 'x2', 'y1', 'y2'])
+
+    def test_payload(self):
+        self.assertMatchesRows(self.get_df(), Bounds3D, {'payload': 'id'},
+                ['t1', 't2'])
+
+    def test_x1_override(self):
+        self.assertMatchesRows(self.get_df(), Bounds3D, {'x1': 'bbox_x1'},
+                ['t1', 't2', 'x1', 'x2', 'y1', 'y2'])
+
+    def test_null_keys(self):
+        df = self.get_df()
+        df['video_id'] = pd.Series(['b', None, 'b', 'a', None, 'c'],
+                dtype=object)
+        self.assertMatchesRows(df, Bounds1D, {'payload': 'id'}, ['t1', 't2'])
+        self.assertIn(None, ism_from_df(df, Bounds1D).get_grouped_intervals())
+
+    def test_nullable_int_keys(self):
+        df = self.get_df()
+        df['video_id'] = pd.array([2, None, 2, 3, None, 1], dtype='Int64')
+        self.assertMatchesRows(df, Bounds1D, {}, ['t1', 't2'])
+        self.assertEqual(
+                set(ism_from_df(df, Bounds1D).get_grouped_intervals()),
+                {1, 2, 3, None})
+
+    def test_spark_df_restores_arrow_conf(self):
+        arrow_key = "spark.sql.execution.arrow.pyspark.enabled"
+        rows = self.get_df().to_dict('records')
+        for conf in [{}, {arrow_key: "false"}]:
+            df = FakeSparkDataFrame(rows, FakeSparkSession(conf))
+            self.assertMappingEq(
+                    ism_from_df(df, Bounds1D, {'payload': 'min_frame'}),
+                    ism_from_df(rows, Bounds1D, {'payload': 'min_frame'}),
+                    ['t1', 't2'])
+            self.assertEqual(df.arrow_enabled, "true")
+            self.assertEqual(df.sparkSession.conf.values, conf)
@@ -102,6 +102,23 @@ class TestIntervalSet(unittest.TestCase):
             Interval(Bounds3D(t,t+1), t+1) for t in range(99)])
         self.assertIntervalSetEq(is3, target, eq)
 
+    def test_default_window_keeps_far_apart_pairs(self):
+        is1 = IntervalSet([Interval(Bounds3D(0,1), 1)])
+        is2 = IntervalSet([Interval(Bounds3D(5,6), 2)])
+        predicate = Bounds3D.T(before())
+
+        is3 = is1.join(is2, predicate,
+                lambda i1, i2: Interval(i1['bounds'].span(i2['bounds'])))
+        self.assertIntervalSetEq(is3,
+                IntervalSet([Interval(Bounds3D(0,6))]), eq)
+
+        is3 = is1.filter_against(is2, predicate)
+        self.assertIntervalSetEq(is3, is1, eq)
+
+        is3 = is1.collect_by_interval(is2, predicate)
+        self.assertEqual(len(is3), 1)
+        self.assertEqual(is3.get_intervals()[0]['payload'][1].size(), 1)
+
     def test_filter(self):
         is1 = IntervalSet([
             Interval(Bounds3D(0,1,0,1,0,1),1),
@@ -231,6 +248,7 @@ class TestIntervalSet(unittest.TestCase):
             ])
         is3 = is1.minus(is2)
         self.assertIntervalSetEq(is3, is1, eq)
+        self.assertIs(is1.minus(IntervalSet([])), is1)
 
     def test_minus_with_single_frame(self):
         is1 = IntervalSet([
@@ -398,6 +416,7 @@ class TestIntervalSet(unittest.TestCase):
             Interval(Bounds3D(6,7,0.1, 0.9,0,1)),
             ])
         self.assertIntervalSetEq(is3, target)
+        self.assertIs(is1.dilate(0), is1)
 
     def test_filter_size(self):
         is1 = IntervalSet([
@@ -417,6 +436,8 @@ class TestIntervalSet(unittest.TestCase):
         self.assertIntervalSetEq(is3, IntervalSet([
             Interval(Bounds3D(1,2,0.5,0.9,0.1,0.2))]))
 
+        self.assertIs(is1.filter_size(), is1)
+
     def test_group_by_axis(self):
         default_bounds = Bounds3D(0, 1, 0, 1, 0, 1)
         intervals_1 = [
@@ -492,6 +513,8 @@ class TestIntervalSet(unittest.TestCase):
         self.assertIntervalSetEq(is1.coalesce(('t1', 't2'), Bounds3D.span,
             payload_plus,epsilon=2),
             IntervalSet([Interval(Bounds3D(1,23),payload=8)]))
+        self.assertIs(target.coalesce(('t1', 't2'), Bounds3D.span,
+            payload_plus, epsilon=0.5), target)
     
     def test_coalesce_with_pred(self):
         def overlapping_bboxes(intrvl1, intrvl2):
@@ -85,3 +85,24 @@ class TestIntervalSetMapping(unittest.TestCase):
         keys = list(k for k in c)
         self.assertEqual(keys, sorted(list(c.get_grouped_intervals().keys())))
 
+
+    def test_parallel_unary(self):
+        c = TestIntervalSetMapping.get_collection()
+        d = c.filter(lambda i: i['t1'] % 2 == 0, parallel=True)
+        self.assertCollectionEq(d, c.filter(lambda i: i['t1'] % 2 == 0))
+
+    def test_parallel_join(self):
+        c = TestIntervalSetMapping.get_collection()
+        d = c.join(c, Bounds3D.T(overlaps()), payload_first, window=0,
+                parallel=True)
+        self.assertCollectionEq(d, c.join(c, Bounds3D.T(overlaps()),
+            payload_first, window=0))
+
+    def test_binary_method_one_sided_keys(self):
+        c = TestIntervalSetMapping.get_collection()
+        c1 = IntervalSetMapping({v: c[v] for v in c if v < 10})
+        d = c1.join(c, Bounds3D.T(overlaps()), payload_first, window=0)
+        self.assertEqual(set(d.keys()), set(c1.keys()))
+        e = c1.union(IntervalSetMapping({100: c[0]}))
+        self.assertIs(e[100], c[0])
+        self.assertIs(e[1], c1[1])
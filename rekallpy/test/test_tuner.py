@@ -1,4 +1,4 @@
-from rekall.tuner import RandomTuner
+from rekall.tuner import RandomTuner, CoordinateDescentTuner
 import unittest
 
 class TestTuner(unittest.TestCase):
@@ -12,3 +12,140 @@ class TestTuner(unittest.TestCase):
         }
 
         tuner = RandomTuner(search_space, eval_config, budget = 50)
+
+    def test_coordinate_descent_finds_optimum(self):
+        def eval_config(params):
+            return -(params['param1'] - 13.0) ** 2 - (params['param2'] - 0.3) ** 2
+
+        search_space = {
+            'param1': { 'range': (10.0, 20.0) },
+            'param2': { 'range': (0.0, 1.0) }
+        }
+
+        tuner = CoordinateDescentTuner(search_space, eval_config,
+                budget = 200, log = False)
+        best_score, _, _, _, _ = tuner.tune(alpha = 0.1, decay_rate = 0.5)
+
+        self.assertAlmostEqual(best_score, 0.0, places=3)
+
+    def test_coordinate_descent_discrete_params(self):
+        def eval_config(params):
+            return -(params['param1'] - 1.0) ** 2 - (params['param2'] - 13.0) ** 2
+
+        search_space = {
+            'param1': [0.0, 1.0, 2.0],
+            'param2': { 'range': (10.0, 20.0) }
+        }
+
+        tuner = CoordinateDescentTuner(search_space, eval_config,
+                budget = 200, log = False)
+        best_score, best_config, _, _, _ = tuner.tune(alpha = 0.1,
+                decay_rate = 0.5, init_method = ''.join(['aver', 'age']))
+
+        self.assertAlmostEqual(best_score, 0.0, places=3)
+        self.assertEqual(best_config['param1'], 1.0)
+        self.assertAlmostEqual(best_config['param2'], 13.0, places=1)
+
+    def test_coordinate_descent_skips_repeated_configs(self):
+        evaluated = []
+        def eval_config(params):
+            evaluated.append(tuple(sorted(params.items())))
+            return -(params['param1'] - 1.0) ** 2 - (params['param2'] - 13.0) ** 2
+
+        search_space = {
+            'param1': [0.0, 1.0, 2.0],
+            'param2': { 'range': (10.0, 20.0) }
+        }
+
+        tuner = CoordinateDescentTuner(search_space, eval_config,
+                budget = 100, log = False)
+        _, _, _, _, cost = tuner.tune(alpha = 0.1, decay_rate = 0.5)
+
+        self.assertEqual(cost, len(evaluated))
+        self.assertEqual(len(evaluated), len(set(evaluated)))
+
+    def test_coordinate_descent_plateau_decays_alpha_early(self):
+        class AlphaTrackingTuner(CoordinateDescentTuner):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.alphas = []
+
+            def line_search(self, values, index, epsilon, budget,
+                    cur_score = 0):
+                self.alphas.append(epsilon)
+                return super().line_search(values, index, epsilon, budget,
+                        cur_score = cur_score)
+
+        # Every step improves the score, but only negligibly
+        def eval_config(params):
+            return 1.0 + 1e-7 * params['param1']
+
+        search_space = {
+            'param1': { 'range': (0.0, 1000.0) }
+        }
+
+        def tune(**kwargs):
+            tuner = AlphaTrackingTuner(search_space, eval_config,
+                    budget = 5000, log = False)
+            _, _, _, _, cost = tuner.tune(alpha = 0.001, decay_rate = 0.5,
+                    **kwargs)
+            return tuner.alphas, cost
+
+        alphas, cost = tune()
+        self.assertEqual(alphas[:3], [0.001] * 3)
+        self.assertEqual(alphas[3], 0.0005)
+
+        for disabled in [{'tol': None}, {'patience': 0}, {'patience': 1}]:
+            disabled_alphas, disabled_cost = tune(**disabled)
+            self.assertGreater(disabled_alphas.count(0.001), 3)
+            self.assertLess(cost, disabled_cost)
+
+    def test_coordinate_descent_batches_discrete_choices(self):
+        class BatchCountingTuner(CoordinateDescentTuner):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.batch_sizes = []
+
+            def evaluate_configs(self, configs):
+                self.batch_sizes.append(len(configs))
+                return super().evaluate_configs(configs)
+
+        def eval_config(params):
+            return -(params['param1'] - 1.0) ** 2
+
+        search_space = {
+            'param1': [0.0, 1.0, 2.0, 3.0]
+        }
+
+        tuner = BatchCountingTuner(search_space, eval_config,
+                budget = 20, log = False)
+        best_score, _, _, _, _ = tuner.tune(alpha = 0.1, decay_rate = 0.5)
+
+        self.assertEqual(best_score, 0.0)
+        self.assertEqual(tuner.batch_sizes[0], 3)
+
+    def test_coordinate_descent_batched_line_search(self):
+        class BatchTuner(CoordinateDescentTuner):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.batch_sizes = []
+
+            def evaluate_configs(self, configs):
+                self.batch_sizes.append(len(configs))
+                return super().evaluate_configs(configs)
+
+        def eval_config(params):
+            return -(params['param1'] - 13.0) ** 2 - (params['param2'] - 0.3) ** 2
+
+        search_space = {
+            'param1': { 'range': (10.0, 20.0) },
+            'param2': { 'range': (0.0, 1.0) }
+        }
+
+        tuner = BatchTuner(search_space, eval_config, budget = 200, log = False)
+        best_score, best_config, _, _, _ = tuner.tune(alpha = 0.1,
+                decay_rate = 0.5)
+
+        self.assertAlmostEqual(best_score, 0.0, places=3)
+        self.assertAlmostEqual(best_config['param1'], 13.0, places=1)
+        self.assertGreater(max(tuner.batch_sizes), 2)